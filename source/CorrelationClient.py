@@ -0,0 +1,72 @@
+import io
+import json
+import socket
+
+import numpy as np
+
+
+class CorrelationClient:
+    """
+    Class that sends requests to a running CorrelationService.
+
+    # Attributes:
+        - `connection (socket.socket)`: The connection to the service.
+        - `stream (io.BufferedReader)`: The buffered stream of the responses.
+
+    # Methods:
+        - `request_correlation(parameters)`: Requests the correlation function for the given parameters.
+        - `close()`: Closes the connection to the service.
+    """
+
+    def __init__(self, socket_path: str = "correlation_service.sock", host: str = "127.0.0.1",
+                 port: int = None) -> None:
+        """
+        Initializes the CorrelationClient object and connects to the service.
+
+        # Args:
+            socket_path (str): The path of the Unix socket of the service.
+            host (str): The host of the service when a port is given.
+            port (int): The port of the service (instead of the Unix socket).
+
+        # Returns:
+            None
+        """
+        if port is not None:
+            self.connection: socket.socket = socket.create_connection((host, port))
+        else:
+            self.connection: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.connection.connect(socket_path)
+        self.stream: io.BufferedReader = self.connection.makefile("rb")
+
+    def request_correlation(self, parameters: dict) -> np.ndarray:
+        """
+        Requests the correlation function for the given parameters.
+
+        # Args:
+            parameters (dict): The parameters of the calculation, with the same keys as the "Parameters.json" file.
+
+        # Raises:
+            ValueError: If the service could not compute the correlation function.
+            ConnectionError: If the service closed the connection.
+
+        # Returns:
+            numpy.ndarray: The computed correlation function.
+        """
+        self.connection.sendall(json.dumps(parameters).encode() + b"\n")
+        header_line: bytes = self.stream.readline()
+        if not header_line:
+            raise ConnectionError("The correlation service closed the connection.")
+        header: dict = json.loads(header_line)
+        if header["status"] != "ok":
+            raise ValueError(f"The correlation service returned an error: {header['message']}")
+        return np.load(io.BytesIO(self.stream.read(header["size"])), allow_pickle=False)
+
+    def close(self) -> None:
+        """
+        Closes the connection to the service.
+
+        # Returns:
+            None
+        """
+        self.stream.close()
+        self.connection.close()
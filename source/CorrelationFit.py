@@ -0,0 +1,244 @@
+import numpy as np
+from numpy.polynomial import chebyshev
+
+
+class CorrelationFit:
+    """
+    Class that stores a compact representation of a radial correlation function C(r) as piecewise Chebyshev
+    polynomials in log(r), and evaluates it at arbitrary distances.
+
+    # Remarks:
+        The distinct sampled distances are first split into clusters at the large gaps of log(r), since a polynomial
+        cannot be trusted across a range without samples. Each cluster is then split into segments holding the same
+        number of distinct distances, with bounds taken among the samples, and, on each closed segment, C is fitted by
+        least squares with a Chebyshev series of the mapped variable in [-1, 1]. A segment always holds at least twice
+        as many distinct distances as coefficients, the number of segments and then the degree being lowered if
+        needed, and the clusters too small to be fitted are dropped.\n
+        The error bound of a segment is estimated off-sample with a hold-out fit on every other distinct distance: it
+        is the largest of the residual of the fit on the samples, the error of the hold-out fit on the held-out samples
+        and the difference between both fits at the midpoints between consecutive distinct distances, and at least the
+        rounding error relative to the largest correlation.\n
+        The distances outside of the segments (beyond the sampled range or in the gaps between clusters) give NaN.\n
+        The representation only depends on the number of segments and on the degree, not on the resolution of the
+        grid, so that the evaluation cost only depends on the number of queried distances.
+
+    # Attributes:
+        - `segment_bounds (numpy.ndarray)`: The lower and upper bounds in log(r) of each segment, of shape
+        (number of segments, 2), sorted by increasing distance.
+        - `coefficients (numpy.ndarray)`: The Chebyshev coefficients of each segment, of shape
+        (number of segments, degree + 1).
+        - `error_bounds (numpy.ndarray)`: The estimated maximal absolute error of the fit on each segment.
+
+    # Methods:
+        - `fit(distance, correlation, segments_number, degree)`: Fits a correlation function sampled at given distances.
+        - `find_clusters(log_distance, segments_number)`: Splits the distinct log distances at their large gaps.
+        - `fit_segment(log_distance, correlation, lower, upper, degree)`: Fits one segment and estimates its error.
+        - `evaluate(distance)`: Evaluates the fitted correlation function at given distances.
+        - `max_error()`: Returns the maximal error bound over all the segments.
+        - `save(path)`: Saves the fit to a `.npz` file.
+        - `load(path)`: Loads a fit from a `.npz` file.
+    """
+
+    def __init__(self, segment_bounds: np.ndarray, coefficients: np.ndarray, error_bounds: np.ndarray) -> None:
+        """
+        Initializes the CorrelationFit object.
+
+        # Args:
+            segment_bounds (numpy.ndarray): The lower and upper bounds in log(r) of each segment.
+            coefficients (numpy.ndarray): The Chebyshev coefficients of each segment.
+            error_bounds (numpy.ndarray): The estimated maximal absolute error of the fit on each segment.
+
+        # Returns:
+            None
+        """
+        self.segment_bounds: np.ndarray = segment_bounds
+        self.coefficients: np.ndarray = coefficients
+        self.error_bounds: np.ndarray = error_bounds
+
+    @staticmethod
+    def fit(distance: np.ndarray, correlation: np.ndarray, segments_number: int, degree: int) -> "CorrelationFit":
+        """
+        Fits a correlation function sampled at given distances with piecewise Chebyshev polynomials in log(r).
+
+        # Remarks:
+            The non positive distances and the non finite correlations are ignored. The segments are shared between
+            the clusters in proportion of their number of distinct distances, so that the fit may have less than
+            `segments_number` segments, and a cluster with `n` distinct distances is fitted with a degree of at most
+            `n // 2 - 1`.
+
+        # Args:
+            distance (numpy.ndarray): The distances of the samples.
+            correlation (numpy.ndarray): The correlation function at the sampled distances.
+            segments_number (int): The maximal number of segments.
+            degree (int): The maximal degree of the Chebyshev series of each segment.
+
+        # Raises:
+            ValueError: If no cluster of samples holds at least two distinct distances.
+
+        # Returns:
+            CorrelationFit: The fitted correlation function.
+        """
+        distance = np.ravel(distance)
+        correlation = np.ravel(correlation)
+        valid: np.ndarray = (distance > 0) & np.isfinite(correlation)
+        log_distance: np.ndarray = np.log(distance[valid])
+        correlation = correlation[valid]
+        distinct_log_distance: np.ndarray = np.unique(log_distance)
+
+        clusters: list = [cluster for cluster in CorrelationFit.find_clusters(distinct_log_distance, segments_number)
+                          if cluster.size >= 2]
+        if not clusters:
+            raise ValueError("At least two close enough distinct distances are needed to fit the correlation.")
+        distinct_number: int = sum(cluster.size for cluster in clusters)
+
+        segment_bounds: list = []
+        coefficients: list = []
+        error_bounds: list = []
+        for cluster in clusters:
+            cluster_degree: int = min(degree, cluster.size // 2 - 1)
+            cluster_segments: int = max(1, min(segments_number * cluster.size // distinct_number,
+                                               cluster.size // (2 * (cluster_degree + 1))))
+            bound_indices: np.ndarray = np.unique(np.round(np.linspace(0, cluster.size - 1,
+                                                                       cluster_segments + 1)).astype(int))
+            for lower_index, upper_index in zip(bound_indices[:-1], bound_indices[1:]):
+                lower: float = cluster[lower_index]
+                upper: float = cluster[upper_index]
+                segment_coefficients, error_bound = CorrelationFit.fit_segment(log_distance, correlation, lower, upper,
+                                                                               cluster_degree)
+                segment_bounds.append((lower, upper))
+                coefficients.append(np.pad(segment_coefficients, (0, degree - cluster_degree)))
+                error_bounds.append(error_bound)
+
+        rounding_error: float = np.finfo(float).eps * (degree + 1) * np.abs(correlation).max()
+        return CorrelationFit(np.array(segment_bounds), np.array(coefficients),
+                              np.maximum(np.array(error_bounds), rounding_error))
+
+    @staticmethod
+    def find_clusters(log_distance: np.ndarray, segments_number: int) -> list:
+        """
+        Splits sorted distinct log distances at their large gaps.
+
+        # Remarks:
+            A gap is large when it is wider than both the width of a segment if the whole range was split in
+            `segments_number` equal segments and four times the median gap.
+
+        # Args:
+            log_distance (numpy.ndarray): The sorted distinct log distances.
+            segments_number (int): The maximal number of segments.
+
+        # Returns:
+            list: The clusters of log distances.
+        """
+        if log_distance.size < 2:
+            return [log_distance]
+        gaps: np.ndarray = np.diff(log_distance)
+        threshold: float = max((log_distance[-1] - log_distance[0]) / segments_number, 4 * np.median(gaps))
+        return np.split(log_distance, np.flatnonzero(gaps > threshold) + 1)
+
+    @staticmethod
+    def fit_segment(log_distance: np.ndarray, correlation: np.ndarray, lower: float, upper: float,
+                    degree: int) -> tuple:
+        """
+        Fits the samples of a closed segment and estimates the error of the fit off-sample.
+
+        # Remarks:
+            The segment must hold at least `2 * (degree + 1)` distinct distances, so that the hold-out fit on every
+            other distinct distance is well determined.
+
+        # Args:
+            log_distance (numpy.ndarray): The log distances of all the samples.
+            correlation (numpy.ndarray): The correlation function at all the samples.
+            lower (float): The lower bound of the segment in log(r).
+            upper (float): The upper bound of the segment in log(r).
+            degree (int): The degree of the Chebyshev series.
+
+        # Returns:
+            tuple: The Chebyshev coefficients and the estimated maximal absolute error of the fit.
+        """
+        in_segment: np.ndarray = (log_distance >= lower) & (log_distance <= upper)
+        mapped: np.ndarray = (2 * log_distance[in_segment] - lower - upper) / (upper - lower)
+        values: np.ndarray = correlation[in_segment]
+        distinct_mapped, rank = np.unique(mapped, return_inverse=True)
+        kept: np.ndarray = rank % 2 == 0
+
+        coefficients: np.ndarray = chebyshev.chebfit(mapped, values, degree)
+        hold_out_coefficients: np.ndarray = chebyshev.chebfit(mapped[kept], values[kept], degree)
+        midpoints: np.ndarray = (distinct_mapped[:-1] + distinct_mapped[1:]) / 2
+
+        residual: float = np.abs(chebyshev.chebval(mapped, coefficients) - values).max()
+        hold_out_error: float = np.abs(chebyshev.chebval(mapped[~kept], hold_out_coefficients) - values[~kept]).max()
+        midpoint_difference: float = np.abs(chebyshev.chebval(midpoints, coefficients)
+                                            - chebyshev.chebval(midpoints, hold_out_coefficients)).max()
+        return coefficients, max(residual, hold_out_error, midpoint_difference)
+
+    def evaluate(self, distance: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the fitted correlation function at the given distances.
+
+        # Remarks:
+            The Chebyshev series are evaluated with the Clenshaw recurrence, vectorized over all the distances, so
+            that the memory used is proportional to the number of distances. The distances outside of the segments
+            give NaN.
+
+        # Args:
+            distance (numpy.ndarray): The distances.
+
+        # Returns:
+            numpy.ndarray: The correlation function, with the shape of the distances.
+        """
+        distance = np.asarray(distance, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_distance: np.ndarray = np.log(distance.ravel())
+        lower: np.ndarray = self.segment_bounds[:, 0]
+        upper: np.ndarray = self.segment_bounds[:, 1]
+        segment: np.ndarray = np.clip(np.searchsorted(lower, log_distance, side="right") - 1, 0, len(lower) - 1)
+        outside: np.ndarray = ~((log_distance >= lower[segment]) & (log_distance <= upper[segment]))
+        log_distance[outside] = lower[segment[outside]]
+        mapped: np.ndarray = (2 * log_distance - lower[segment] - upper[segment]) / (upper[segment] - lower[segment])
+
+        twice_mapped: np.ndarray = 2 * mapped
+        next_term: np.ndarray = np.zeros(mapped.shape)
+        current_term: np.ndarray = np.zeros(mapped.shape)
+        for order in range(self.coefficients.shape[1] - 1, 0, -1):
+            coefficient: np.ndarray = self.coefficients[segment, order]
+            next_term, current_term = current_term, twice_mapped * current_term - next_term + coefficient
+        correlation: np.ndarray = mapped * current_term - next_term + self.coefficients[segment, 0]
+        correlation[outside] = np.nan
+        return correlation.reshape(distance.shape)
+
+    def max_error(self) -> float:
+        """
+        Returns the maximal error bound over all the segments.
+
+        # Returns:
+            float: The estimated maximal absolute error of the fit.
+        """
+        return float(self.error_bounds.max())
+
+    def save(self, path: str) -> None:
+        """
+        Saves the fit to a `.npz` file.
+
+        # Args:
+            path (str): The path of the file.
+
+        # Returns:
+            None
+        """
+        with open(path, "wb") as file:
+            np.savez(file, segment_bounds=self.segment_bounds, coefficients=self.coefficients,
+                     error_bounds=self.error_bounds)
+
+    @staticmethod
+    def load(path: str) -> "CorrelationFit":
+        """
+        Loads a fit from a `.npz` file.
+
+        # Args:
+            path (str): The path of the file.
+
+        # Returns:
+            CorrelationFit: The loaded fit.
+        """
+        with np.load(path) as file:
+            return CorrelationFit(file["segment_bounds"], file["coefficients"], file["error_bounds"])
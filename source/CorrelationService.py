@@ -0,0 +1,421 @@
+import argparse
+import asyncio
+import io
+import json
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from MeasuredSpectrum import MeasuredSpectrum
+from ParametersHelper import ParametersHelper
+
+
+class CorrelationService:
+    """
+    Class that manages a long-lived local service computing correlation functions, keeping the wave vector grids and
+    the recent results in memory and batching the concurrent requests.
+
+    # Remarks:
+        The service listens on a Unix socket (or on localhost TCP). A request is a JSON line containing the physical and
+        numerical parameters of the "Parameters.json" file (`temperature`, `volumic_mass`, `surface_tension`, `kappa`,
+        `area`, `spectrum_function`, `inverse_fourier_transform_method`, `resolution`, `ft_normalization` and
+        `measured_spectrum` if needed), the other entries are ignored. The response is a JSON header line `{"status":
+        "ok", "size": ..., "cached": ...}` followed by `size` bytes containing the computed correlation function in the
+        `.npy` format, or a JSON line `{"status": "error", "message": ...}`. Several requests can be sent on the same
+        connection.\n
+        The requests received within `batch_window` seconds are coalesced: identical requests share a single
+        computation and the spectrums with the same resolution and inverse Fourier Transform method are stacked and
+        transformed at once. The FFT plans are cached by numpy for the lifetime of the process.\n
+        The results and the grids are kept in least recently used caches bounded by `max_cache_bytes` and
+        `max_grid_bytes`, the opened measured spectrums in a least recently used cache bounded by
+        `max_measured_spectrums`. The requests whose grid alone would exceed `max_grid_bytes` are refused.\n
+        Over TCP, the measured spectrums are refused unless `measured_spectrum_directory` is configured, in which case
+        their files must be inside this directory.
+
+    # Attributes:
+        - `max_cache_bytes (int)`: The maximal size in bytes of the cached results.
+        - `max_grid_bytes (int)`: The maximal size in bytes of the cached wave vector grids.
+        - `max_measured_spectrums (int)`: The maximal number of opened measured spectrums.
+        - `batch_window (float)`: The time in seconds during which the requests are gathered in a batch.
+        - `max_batch_size (int)`: The maximal number of requests in a batch.
+        - `measured_spectrum_directory (str)`: The directory containing the measured spectrums allowed in requests.
+        - `is_tcp (bool)`: Flag indicating if the service listens on TCP.
+        - `result_cache (OrderedDict)`: The cached results, indexed by the canonical request.
+        - `cache_bytes (int)`: The current size in bytes of the cached results.
+        - `grid_cache (OrderedDict)`: The cached wave vector grids, indexed by resolution and frequency bounds.
+        - `grid_bytes (int)`: The current size in bytes of the cached wave vector grids.
+        - `measured_spectrum_cache (OrderedDict)`: The opened measured spectrums, indexed by their parameters.
+        - `pending_requests (asyncio.Queue)`: The requests waiting to be batched.
+        - `in_flight (dict)`: The futures of the requests being computed, indexed by the canonical request.
+
+    # Methods:
+        - `serve(socket_path, host, port)`: Runs the service until it is cancelled.
+        - `handle_connection(reader, writer)`: Answers the requests of a client.
+        - `get_correlation(parameters)`: Returns the correlation function for the given parameters.
+        - `process_batches()`: Gathers the pending requests in batches and computes them.
+        - `compute_batch(batch)`: Computes the correlation functions of a batch of requests.
+        - `get_measured_spectrum(parameters)`: Returns the (cached) measured spectrum of a request.
+        - `check_measured_spectrum_path(parameters)`: Checks that a request is allowed to read its measured spectrum.
+        - `check_resolution(resolution)`: Checks that the grid of a resolution fits in the grid memory budget.
+        - `get_grid(resolution, min_frequency, max_frequency)`: Returns the (cached) wave vector grid.
+        - `store_result(key, correlation)`: Stores a result in the cache and evicts the oldest ones.
+        - `encode_array(array)`: Encodes an array in the `.npy` format.
+    """
+
+    def __init__(self, max_cache_bytes: int = 1 << 30, max_grid_bytes: int = 1 << 30,
+                 max_measured_spectrums: int = 8, batch_window: float = 0.005, max_batch_size: int = 64,
+                 measured_spectrum_directory: str = None) -> None:
+        """
+        Initializes the CorrelationService object with empty caches.
+
+        # Args:
+            max_cache_bytes (int): The maximal size in bytes of the cached results.
+            max_grid_bytes (int): The maximal size in bytes of the cached wave vector grids.
+            max_measured_spectrums (int): The maximal number of opened measured spectrums.
+            batch_window (float): The time in seconds during which the requests are gathered in a batch.
+            max_batch_size (int): The maximal number of requests in a batch.
+            measured_spectrum_directory (str): The directory containing the measured spectrums allowed in requests
+            (None to allow any file on a Unix socket and none over TCP).
+
+        # Returns:
+            None
+        """
+        self.max_cache_bytes: int = max_cache_bytes
+        self.max_grid_bytes: int = max_grid_bytes
+        self.max_measured_spectrums: int = max_measured_spectrums
+        self.batch_window: float = batch_window
+        self.max_batch_size: int = max_batch_size
+        self.measured_spectrum_directory: str = measured_spectrum_directory
+        self.is_tcp: bool = False
+        self.result_cache: OrderedDict = OrderedDict()
+        self.cache_bytes: int = 0
+        self.grid_cache: OrderedDict = OrderedDict()
+        self.grid_bytes: int = 0
+        self.measured_spectrum_cache: OrderedDict = OrderedDict()
+        self.pending_requests: asyncio.Queue = None
+        self.in_flight: dict = {}
+
+    async def serve(self, socket_path: str = None, host: str = "127.0.0.1", port: int = None) -> None:
+        """
+        Runs the service until it is cancelled.
+
+        # Args:
+            socket_path (str): The path of the Unix socket to listen on.
+            host (str): The host to listen on when no Unix socket is given.
+            port (int): The port to listen on when no Unix socket is given.
+
+        # Raises:
+            ValueError: If neither a Unix socket nor a port is given.
+
+        # Returns:
+            None
+        """
+        self.pending_requests = asyncio.Queue()
+        if socket_path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path=socket_path)
+        elif port is not None:
+            self.is_tcp = True
+            server = await asyncio.start_server(self.handle_connection, host=host, port=port)
+        else:
+            raise ValueError("A Unix socket path or a port must be provided.")
+
+        batcher: asyncio.Task = asyncio.create_task(self.process_batches())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answers the requests of a client until it closes the connection.
+
+        # Args:
+            reader (asyncio.StreamReader): The stream of the requests.
+            writer (asyncio.StreamWriter): The stream of the responses.
+
+        # Returns:
+            None
+        """
+        try:
+            while line := await reader.readline():
+                try:
+                    correlation, cached = await self.get_correlation(json.loads(line))
+                except Exception as error:
+                    writer.write(json.dumps({"status": "error", "message": repr(error)}).encode() + b"\n")
+                else:
+                    payload: bytes = self.encode_array(correlation)
+                    writer.write(json.dumps({"status": "ok", "size": len(payload), "cached": cached}).encode()
+                                 + b"\n")
+                    writer.write(payload)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def get_correlation(self, parameters: dict) -> tuple:
+        """
+        Returns the correlation function for the given parameters, from the cache, from an identical request being
+        computed or from a new batched computation.
+
+        # Args:
+            parameters (dict): The parameters of the request.
+
+        # Raises:
+            KeyError: If a parameter of the calculation is missing.
+            PermissionError: If the request is not allowed to read its measured spectrum file.
+            ValueError: If the grid of the requested resolution does not fit in the grid memory budget.
+
+        # Returns:
+            tuple: The correlation function and a flag indicating if it was found in the cache.
+        """
+        key: str = ParametersHelper.calculation_key(parameters)
+        self.check_measured_spectrum_path(parameters)
+        self.check_resolution(parameters["resolution"])
+        if key in self.result_cache:
+            self.result_cache.move_to_end(key)
+            return self.result_cache[key], True
+        if key not in self.in_flight:
+            self.in_flight[key] = asyncio.get_running_loop().create_future()
+            await self.pending_requests.put((key, parameters))
+        return await asyncio.shield(self.in_flight[key]), False
+
+    async def process_batches(self) -> None:
+        """
+        Gathers the pending requests received within the batch window in batches and computes them in a worker
+        thread.
+
+        # Returns:
+            None
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        while True:
+            batch: list = [await self.pending_requests.get()]
+            deadline: float = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(await asyncio.wait_for(self.pending_requests.get(),
+                                                        max(deadline - loop.time(), 0)))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results: dict = await loop.run_in_executor(None, self.compute_batch, batch)
+            except Exception as error:
+                results: dict = {key: error for key, _ in batch}
+            for key, _ in batch:
+                future: asyncio.Future = self.in_flight.pop(key)
+                result = results[key]
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    self.store_result(key, result)
+                    future.set_result(result)
+
+    def compute_batch(self, batch: list) -> dict:
+        """
+        Computes the correlation functions of a batch of requests, stacking the spectrums that share the same
+        resolution and inverse Fourier Transform method in a single transform.
+
+        # Remarks:
+            The derived frequencies, the wave vector grid and the normalisation factor are computed with
+            ParametersHelper.py, as in MainProgram.py. An error only fails the requests it concerns.
+
+        # Args:
+            batch (list): The requests of the batch, as (key, parameters) tuples.
+
+        # Returns:
+            dict: The correlation function (or the exception raised) of each request, indexed by key.
+        """
+        results: dict = {}
+        groups: dict = {}
+        for key, parameters in batch:
+            try:
+                resolution: int = parameters["resolution"]
+                characteristic_frequencies: dict = ParametersHelper.compute_characteristic_frequencies(
+                    parameters["volumic_mass"], parameters["surface_tension"], parameters["kappa"])
+                wave_vector_x, wave_vector_y = self.get_grid(resolution, characteristic_frequencies["min_frequency"],
+                                                             characteristic_frequencies["max_frequency"])
+                spectrum_function: callable = ParametersHelper.resolve_spectrum_function(
+                    parameters, self.get_measured_spectrum(parameters))
+                spectrum: np.ndarray = spectrum_function(wave_vector_x, wave_vector_y, parameters["temperature"],
+                                                         parameters["volumic_mass"], parameters["surface_tension"],
+                                                         parameters["area"], parameters["kappa"])
+                normalisation_factor: float = ParametersHelper.compute_normalisation_factor(
+                    parameters["ft_normalization"], parameters["area"])
+                method_name: str = parameters["inverse_fourier_transform_method"]
+                ParametersHelper.resolve_inverse_fourier_transform_method(method_name)
+            except Exception as error:
+                results[key] = error
+                continue
+            groups.setdefault((resolution, method_name), []).append((key, spectrum, normalisation_factor))
+
+        for (_, method_name), requests in groups.items():
+            try:
+                inverse_fourier_transform_method: callable = ParametersHelper.resolve_inverse_fourier_transform_method(
+                    method_name)
+                correlations: np.ndarray = inverse_fourier_transform_method(
+                    np.stack([spectrum for _, spectrum, _ in requests]))
+            except Exception as error:
+                for key, _, _ in requests:
+                    results[key] = error
+                continue
+            for (key, _, normalisation_factor), correlation in zip(requests, correlations):
+                results[key] = normalisation_factor * correlation
+        return results
+
+    def get_measured_spectrum(self, parameters: dict) -> MeasuredSpectrum:
+        """
+        Returns the (cached) measured spectrum of a request, so that its file is opened and its radial profile is
+        computed only once.
+
+        # Args:
+            parameters (dict): The parameters of the request.
+
+        # Returns:
+            MeasuredSpectrum: The measured spectrum, or None if the request does not use a measured spectrum.
+        """
+        if parameters["spectrum_function"] != "measured_spectrum":
+            return None
+        key: str = json.dumps(parameters["measured_spectrum"], sort_keys=True)
+        if key in self.measured_spectrum_cache:
+            self.measured_spectrum_cache.move_to_end(key)
+            return self.measured_spectrum_cache[key]
+        self.measured_spectrum_cache[key] = MeasuredSpectrum.from_parameters(parameters["measured_spectrum"])
+        while len(self.measured_spectrum_cache) > self.max_measured_spectrums:
+            _, evicted = self.measured_spectrum_cache.popitem(last=False)
+            evicted.close()
+        return self.measured_spectrum_cache[key]
+
+    def check_measured_spectrum_path(self, parameters: dict) -> None:
+        """
+        Checks that a request is allowed to read its measured spectrum file.
+
+        # Remarks:
+            When a measured spectrum directory is configured, the file must be inside it. Otherwise, the measured
+            spectrums are only accepted on a Unix socket (whose access is controlled by the file permissions) and are
+            refused over TCP, where any user of the machine can connect.
+
+        # Args:
+            parameters (dict): The parameters of the request.
+
+        # Raises:
+            PermissionError: If the request is not allowed to read its measured spectrum file.
+
+        # Returns:
+            None
+        """
+        if parameters["spectrum_function"] != "measured_spectrum":
+            return
+        if self.measured_spectrum_directory is None:
+            if self.is_tcp:
+                raise PermissionError("Measured spectrums are refused over TCP unless a measured spectrum directory "
+                                      "is configured.")
+            return
+        path: Path = Path(parameters["measured_spectrum"]["path"]).resolve()
+        if not path.is_relative_to(Path(self.measured_spectrum_directory).resolve()):
+            raise PermissionError("The measured spectrum file is outside of the measured spectrum directory.")
+
+    def check_resolution(self, resolution: int) -> None:
+        """
+        Checks that the wave vector grid of a resolution fits in the grid memory budget, so that a single request
+        cannot allocate an arbitrarily large grid.
+
+        # Args:
+            resolution (int): The number of points in each direction.
+
+        # Raises:
+            ValueError: If the grid does not fit in `max_grid_bytes`.
+
+        # Returns:
+            None
+        """
+        grid_bytes: int = 2 * resolution ** 2 * np.dtype(float).itemsize
+        if grid_bytes > self.max_grid_bytes:
+            raise ValueError(f"The grid of resolution {resolution} ({grid_bytes} bytes) does not fit in the grid "
+                             f"memory budget ({self.max_grid_bytes} bytes).")
+
+    def get_grid(self, resolution: int, min_frequency: float, max_frequency: float) -> tuple:
+        """
+        Returns the wave vector grid of the given resolution and bounds (see MainProgram.init_arrays), from the cache
+        when possible, and evicts the least recently used grids beyond `max_grid_bytes`.
+
+        # Args:
+            resolution (int): The number of points in each direction.
+            min_frequency (float): The lower bound of the frequency.
+            max_frequency (float): The upper bound of the frequency.
+
+        # Returns:
+            tuple: The wave vectors in the x and y directions.
+        """
+        key: tuple = (resolution, min_frequency, max_frequency)
+        if key in self.grid_cache:
+            self.grid_cache.move_to_end(key)
+            return self.grid_cache[key]
+        grid: tuple = ParametersHelper.compute_wave_vector_grid(min_frequency, max_frequency, resolution)
+        grid_bytes: int = sum(wave_vector.nbytes for wave_vector in grid)
+        if grid_bytes > self.max_grid_bytes:
+            return grid
+        self.grid_cache[key] = grid
+        self.grid_bytes += grid_bytes
+        while self.grid_bytes > self.max_grid_bytes:
+            _, evicted = self.grid_cache.popitem(last=False)
+            self.grid_bytes -= sum(wave_vector.nbytes for wave_vector in evicted)
+        return grid
+
+    def store_result(self, key: str, correlation: np.ndarray) -> None:
+        """
+        Stores a result in the cache and evicts the least recently used ones beyond `max_cache_bytes`.
+
+        # Args:
+            key (str): The canonical request.
+            correlation (numpy.ndarray): The correlation function.
+
+        # Returns:
+            None
+        """
+        if correlation.nbytes > self.max_cache_bytes:
+            return
+        if key in self.result_cache:
+            self.cache_bytes -= self.result_cache.pop(key).nbytes
+        self.result_cache[key] = correlation
+        self.cache_bytes += correlation.nbytes
+        while self.cache_bytes > self.max_cache_bytes:
+            _, evicted = self.result_cache.popitem(last=False)
+            self.cache_bytes -= evicted.nbytes
+
+    @staticmethod
+    def encode_array(array: np.ndarray) -> bytes:
+        """
+        Encodes an array in the `.npy` format.
+
+        # Args:
+            array (numpy.ndarray): The array to encode.
+
+        # Returns:
+            bytes: The encoded array.
+        """
+        buffer: io.BytesIO = io.BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Local service computing correlation functions.")
+    argument_parser.add_argument("--socket", default="correlation_service.sock", help="Path of the Unix socket.")
+    argument_parser.add_argument("--port", type=int, default=None, help="Localhost port (instead of the socket).")
+    argument_parser.add_argument("--max-cache-bytes", type=int, default=1 << 30, help="Size of the result cache.")
+    argument_parser.add_argument("--max-grid-bytes", type=int, default=1 << 30, help="Size of the grid cache.")
+    argument_parser.add_argument("--max-measured-spectrums", type=int, default=8,
+                                 help="Number of measured spectrums kept open.")
+    argument_parser.add_argument("--measured-spectrum-directory", default=None,
+                                 help="Directory containing the measured spectrums allowed in requests.")
+    arguments = argument_parser.parse_args()
+
+    service = CorrelationService(max_cache_bytes=arguments.max_cache_bytes, max_grid_bytes=arguments.max_grid_bytes,
+                                 max_measured_spectrums=arguments.max_measured_spectrums,
+                                 measured_spectrum_directory=arguments.measured_spectrum_directory)
+    if arguments.port is not None:
+        asyncio.run(service.serve(port=arguments.port))
+    else:
+        asyncio.run(service.serve(socket_path=arguments.socket))
@@ -51,6 +51,8 @@ class FileHelper:
         paths["computed_correlation"] = str(calculation_directory / Path(paths['computed_correlation']))
         paths["true_correlation"] = str(calculation_directory / Path(paths['true_correlation']))
         paths["frequency_spectrum"] = str(calculation_directory / Path(paths['frequency_spectrum']))
+        paths["correlation_fit"] = str(calculation_directory / Path(paths.get('correlation_fit',
+                                                                              "Datas\\correlation_fit.npz")))
         paths["frequency_plot"] = str(calculation_directory / Path(paths['frequency_plot']))
         paths["correlation_plot"] = str(calculation_directory / Path(paths['correlation_plot']))
         paths["comparison_plot"] = str(calculation_directory / Path(paths['comparison_plot']))
@@ -62,13 +64,15 @@ class FileHelper:
         return str(calculation_directory / "OutputPaths.json")
 
     @staticmethod
-    def give_output_path(output_file_path: str, key: str) -> str:
+    def give_output_path(output_file_path: str, key: str, default: str = None) -> str:
         """
         Retrieves a specific path from the given configuration file.
 
         # Args:
         - `config_file_path (str)`: Path to the configuration file.
         - `key (str)`: Key for the desired value in the configuration file.
+        - `default (str)`: Path relative to the calculation directory used when the key is missing (e.g. for
+        calculation directories created before the key was added), or None to raise a KeyError.
 
         # Returns:
         - `str`: The value associated with the specified key in the configuration file.
@@ -76,6 +80,8 @@ class FileHelper:
         with open(output_file_path) as config_file:
             config: dict = json.load(config_file)
 
+        if key not in config and default is not None:
+            return str(Path(output_file_path).parent / Path(default))
         value: str = config[key]
 
         config_file.close()
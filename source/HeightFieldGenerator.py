@@ -0,0 +1,146 @@
+from typing import Iterator
+
+import numpy as np
+
+from RunningStatistics import RunningStatistics
+
+
+class HeightFieldGenerator:
+    """
+    Class that draws seeded batches of Gaussian membrane height fields with a given frequency spectrum and accumulates
+    the empirical spectrum and correlation function of the realizations.
+
+    # Remarks:
+        The spectrum is expected on the same grid as the one given to the inverse Fourier Transform methods of
+        FourierTransform.py (typically computed with a method of Spectrums.py). A real white noise of shape
+        (resolution, 2 * (resolution - 1)) is transformed with a batched rfft2, coloured by the square root of the
+        spectrum and transformed back with irfft2, so that the height fields live on the same grid as the output of
+        `FourierTransform.inverse_fft`.\n
+        The empirical spectrum is the periodogram |rfft2(h)|^2 / N of each realization and the empirical correlation
+        is its inverse transform. Their running means converge to the spectrum and to `FourierTransform.inverse_fft`
+        of the spectrum (before any normalisation factor).\n
+        The first and last columns of the spectrum (kx index 0 and resolution - 1) are reduced by irfft2 to their
+        Hermitian part, so they are symmetrized (S[k] <- (S[k] + S[-k]) / 2 along the y axis) before taking the square
+        root. The empirical spectrum converges to this symmetrized spectrum, which has the same inverse Fourier
+        Transform as the original one.\n
+        All the batch arrays are allocated once and reused, so the yielded height fields are overwritten at the next
+        iteration and must be copied if they are kept. The FFT `out` arguments require numpy >= 2.0.
+
+    # Attributes:
+        - `batch_size (int)`: The number of realizations drawn per batch.
+        - `symmetrized_spectrum (numpy.ndarray)`: The spectrum with Hermitian symmetric edge columns.
+        - `amplitude (numpy.ndarray)`: The square root of the symmetrized spectrum.
+        - `field_shape (tuple)`: The shape of a single height field.
+        - `random_generator (numpy.random.Generator)`: The seeded random generator.
+        - `spectrum_statistics (RunningStatistics)`: The running statistics of the empirical spectrum.
+        - `correlation_statistics (RunningStatistics)`: The running statistics of the empirical correlation function.
+
+    # Methods:
+        - `generate(number_of_batches)`: Yields batches of height fields and updates the running statistics.
+        - `empirical_spectrum()`: Returns the running mean of the empirical spectrum.
+        - `empirical_correlation_function()`: Returns the running mean of the empirical correlation function.
+    """
+
+    def __init__(self, spectrum: np.ndarray, batch_size: int, seed: int = None) -> None:
+        """
+        Initializes the HeightFieldGenerator object and allocates the batch buffers.
+
+        # Args:
+            spectrum (numpy.ndarray): The frequency spectrum of the height fields, of shape (resolution, resolution).
+            batch_size (int): The number of realizations drawn per batch.
+            seed (int): The seed of the random generator.
+
+        # Raises:
+            ValueError: If the spectrum is not a square 2D array of resolution at least 2, contains negative values or if
+            the batch size is not positive.
+
+        # Returns:
+            None
+        """
+        if spectrum.ndim != 2 or spectrum.shape[0] != spectrum.shape[1]:
+            raise ValueError("The spectrum must be a square 2D array.")
+        if spectrum.shape[0] < 2:
+            raise ValueError("The resolution of the spectrum must be at least 2.")
+        if np.any(spectrum < 0):
+            raise ValueError("The spectrum must be non negative.")
+        if batch_size < 1:
+            raise ValueError("The batch size must be positive.")
+
+        resolution: int = spectrum.shape[0]
+        self.batch_size: int = batch_size
+        self.symmetrized_spectrum: np.ndarray = np.array(spectrum, dtype=float)
+        for column in (0, resolution - 1):
+            opposite: np.ndarray = np.roll(self.symmetrized_spectrum[::-1, column], 1)
+            self.symmetrized_spectrum[:, column] = (self.symmetrized_spectrum[:, column] + opposite) / 2
+        self.amplitude: np.ndarray = np.sqrt(self.symmetrized_spectrum)
+        self.field_shape: tuple = (resolution, 2 * (resolution - 1))
+        self.random_generator: np.random.Generator = np.random.default_rng(seed)
+        self.spectrum_statistics: RunningStatistics = RunningStatistics(spectrum.shape)
+        self.correlation_statistics: RunningStatistics = RunningStatistics(self.field_shape)
+        self._height_buffer: np.ndarray = np.empty((batch_size, *self.field_shape))
+        self._fourier_buffer: np.ndarray = np.empty((batch_size, *spectrum.shape), dtype=complex)
+        self._power_buffer: np.ndarray = np.empty((batch_size, *spectrum.shape))
+        self._correlation_buffer: np.ndarray = np.empty((batch_size, *self.field_shape))
+
+    def generate(self, number_of_batches: int) -> Iterator[np.ndarray]:
+        """
+        Yields batches of height fields and updates the running statistics with each of them.
+
+        # Args:
+            number_of_batches (int): The number of batches to draw.
+
+        # Returns:
+            Iterator[numpy.ndarray]: Batches of height fields of shape (batch_size, *field_shape).
+        """
+        points_number: int = self.field_shape[0] * self.field_shape[1]
+        for _ in range(number_of_batches):
+            self.random_generator.standard_normal(out=self._height_buffer)
+            np.fft.rfft2(self._height_buffer, out=self._fourier_buffer)
+            self._fourier_buffer *= self.amplitude
+            self._inverse_transform(self._height_buffer)
+
+            np.fft.rfft2(self._height_buffer, out=self._fourier_buffer)
+            np.abs(self._fourier_buffer, out=self._power_buffer)
+            self._power_buffer **= 2
+            self._power_buffer /= points_number
+            np.copyto(self._fourier_buffer, self._power_buffer)
+            self._inverse_transform(self._correlation_buffer)
+
+            self.spectrum_statistics.update(self._power_buffer)
+            self.correlation_statistics.update(self._correlation_buffer)
+            yield self._height_buffer
+
+    def _inverse_transform(self, out: np.ndarray) -> None:
+        """
+        Computes the batched irfft2 of the Fourier buffer into the given real buffer.
+
+        # Remarks:
+            The transform is split into a complex ifft along the first axis, done in place in the Fourier buffer, and
+            a real irfft along the last axis, so that no intermediate array is allocated.
+
+        # Args:
+            out (numpy.ndarray): The real buffer of shape (batch_size, *field_shape) receiving the result.
+
+        # Returns:
+            None
+        """
+        np.fft.ifft(self._fourier_buffer, axis=-2, out=self._fourier_buffer)
+        np.fft.irfft(self._fourier_buffer, n=self.field_shape[1], axis=-1, out=out)
+
+    def empirical_spectrum(self) -> np.ndarray:
+        """
+        Returns the running mean of the empirical spectrum over all the realizations drawn so far.
+
+        # Returns:
+            numpy.ndarray: The empirical spectrum, comparable with `symmetrized_spectrum`.
+        """
+        return self.spectrum_statistics.mean
+
+    def empirical_correlation_function(self) -> np.ndarray:
+        """
+        Returns the running mean of the empirical correlation function over all the realizations drawn so far.
+
+        # Returns:
+            numpy.ndarray: The empirical correlation function, comparable with `FourierTransform.inverse_fft`.
+        """
+        return self.correlation_statistics.mean
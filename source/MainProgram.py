@@ -4,10 +4,11 @@ import json
 import numpy as np
 from pathlib import Path
 
+from CorrelationFit import CorrelationFit
 from CorrelationFunctions import CorrelationFunctions
 from FileHelper import FileHelper
-from FourierTransform import FourierTransform
-from Spectrums import FrequencySpectrums
+from HeightFieldGenerator import HeightFieldGenerator
+from ParametersHelper import ParametersHelper
 from Visualizer import Visualizer
 
 
@@ -43,6 +44,11 @@ class MainProgram:
         - `true_correlation_function (ndarray)`: The true correlation function.
         - `frequency_spectrum (ndarray)`: The frequency spectrum.
         - `computed_correlation_function (ndarray)`: The computed correlation function.
+        - `correlation_fit (CorrelationFit)`: The compact fitted representation of the computed correlation function.
+        - `correlation_fit_path (str)`: The path to save the fitted correlation function.
+        - `correlation_fit_segments (int)`: The maximal number of segments of the fitted correlation function.
+        - `correlation_fit_degree (int)`: The degree of each segment of the fitted correlation function.
+        - `empirical_correlation_function (ndarray)`: The correlation function measured on random height fields.
         - `correlation_function_path (str)`: The path to save the computed correlation function.
         - `resolution (int)`: The resolution (number of points in the space and frequency arrays).
         - `calculation_paths_file_path (str)`: The path of the current calculation directory.
@@ -60,6 +66,8 @@ class MainProgram:
         - `compute_frequency_spectrum()`: Computes the frequency spectrum.
         - `assign_normalisation_factor()`: Assigns the normalization factor.
         - `compute_inverse_fourier_transform()`: Computes the inverse Fourier Transform.
+        - `fit_correlation_function()`: Fits a compact representation of the computed correlation function.
+        - `compute_empirical_correlation_function()`: Measures the correlation function on random height fields.
         - `save_results()`: Saves the results to CSV files.
         - `execute()`: Executes the main program flow.
     """
@@ -97,6 +105,11 @@ class MainProgram:
         self.true_correlation_function: np.ndarray = None
         self.frequency_spectrum: np.ndarray = None
         self.computed_correlation_function: np.ndarray = None
+        self.correlation_fit: CorrelationFit = None
+        self.correlation_fit_path: str = None
+        self.correlation_fit_segments: int = None
+        self.correlation_fit_degree: int = None
+        self.empirical_correlation_function: np.ndarray = None
         self.correlation_function_path: str = None
         self.resolution: int = None
         self.calculation_paths_file_path: str = FileHelper.init_calculation_directory()
@@ -119,6 +132,8 @@ class MainProgram:
                                                                           "true_correlation")
         self.frequency_spectrum_path = FileHelper.give_output_path(self.calculation_paths_file_path,
                                                                    "frequency_spectrum")
+        self.correlation_fit_path = FileHelper.give_output_path(self.calculation_paths_file_path, "correlation_fit",
+                                                                "Datas\\correlation_fit.npz")
 
     def get_parameters_from_json(self) -> None:
         """
@@ -145,12 +160,17 @@ class MainProgram:
         self.resolution = self.parameters["resolution"]
         self.is_accuracy_test = self.parameters["is_accuracy_test"]
         self.ft_normalization = self.parameters["ft_normalization"]
-        self.capillary_frequency = np.sqrt(self.volumic_mass / self.surface_tension)
-        self.curvature_frequency = np.sqrt(self.surface_tension / self.kappa)
-        self.min_frequency = self.curvature_frequency * 1e-13
-        self.max_frequency = self.curvature_frequency * 10
-        self.min_distance = 1 / self.max_frequency
-        self.max_distance = 1 / self.min_frequency
+        self.correlation_fit_segments = self.parameters.get("correlation_fit_segments", 32)
+        self.correlation_fit_degree = self.parameters.get("correlation_fit_degree", 8)
+        characteristic_frequencies: dict = ParametersHelper.compute_characteristic_frequencies(self.volumic_mass,
+                                                                                               self.surface_tension,
+                                                                                               self.kappa)
+        self.capillary_frequency = characteristic_frequencies["capillary_frequency"]
+        self.curvature_frequency = characteristic_frequencies["curvature_frequency"]
+        self.min_frequency = characteristic_frequencies["min_frequency"]
+        self.max_frequency = characteristic_frequencies["max_frequency"]
+        self.min_distance = characteristic_frequencies["min_distance"]
+        self.max_distance = characteristic_frequencies["max_distance"]
         self.save_computed_parameters()
         self.check_and_assign_spectrum_function(self.parameters["spectrum_function"])
         self.check_and_assign_inverse_fourier_transform_method(self.parameters["inverse_fourier_transform_method"])
@@ -176,6 +196,10 @@ class MainProgram:
         Checks if the spectrum function provided in the parameters is valid (correspond to an existing method in
         Spectrums.py) and assigns it to the MainProgram
 
+        # Remarks:
+            The special name `measured_spectrum` assigns the tabulated spectrum described by the "measured_spectrum"
+            parameters (see MeasuredSpectrum.py).
+
         # Args:
             spectrum_function (str): The name of the spectrum function to be checked and assigned.
 
@@ -185,11 +209,8 @@ class MainProgram:
         # Returns:
             None
         """
-        spectrum_method: callable = getattr(FrequencySpectrums, spectrum_function, None)
-        if spectrum_method is not None and callable(spectrum_method):
-            self.spectrum_function = spectrum_method
-        else:
-            raise ValueError("The spectrum function provided in the parameters is not valid.")
+        self.spectrum_function = ParametersHelper.resolve_spectrum_function(dict(self.parameters,
+                                                                                 spectrum_function=spectrum_function))
 
     def check_and_assign_inverse_fourier_transform_method(self, inverse_fourier_transform_method) -> None:
         """
@@ -205,11 +226,8 @@ class MainProgram:
         # Returns:
             None
         """
-        inverse_fourier_transform_method: callable = getattr(FourierTransform, inverse_fourier_transform_method, None)
-        if inverse_fourier_transform_method is not None and callable(inverse_fourier_transform_method):
-            self.inverse_fourier_transform_method = inverse_fourier_transform_method
-        else:
-            raise ValueError("The inverse fourier transform method provided in the parameters is not valid.")
+        self.inverse_fourier_transform_method = ParametersHelper.resolve_inverse_fourier_transform_method(
+            inverse_fourier_transform_method)
 
     def init_arrays(self) -> None:
         """
@@ -218,11 +236,10 @@ class MainProgram:
         # Returns:
             None
         """
-        wave_vector_array: np.ndarray = np.logspace(np.log10(self.min_frequency), np.log10(self.max_frequency),
-                                                    self.resolution)
         space_array: np.ndarray = np.linspace(self.min_distance, self.max_distance, self.resolution)
 
-        self.wave_vector_array_x, self.wave_vector_array_y = np.meshgrid(wave_vector_array, wave_vector_array)
+        self.wave_vector_array_x, self.wave_vector_array_y = ParametersHelper.compute_wave_vector_grid(
+            self.min_frequency, self.max_frequency, self.resolution)
         self.space_array_x, self.space_array_y = np.meshgrid(space_array, space_array)
         self.true_correlation_function = np.zeros((self.resolution, self.resolution))
 
@@ -266,16 +283,14 @@ class MainProgram:
             to the Fourier Transform and so it will not be applied to the inverse Fourier Transform.
             - `asymmetric_ift`: The squared normalisation factor is considered to not have been applied to the Fourier 
             Transform and so it will be applied to the inverse Fourier Transform.
+
+        # Raises:
+            ValueError: If the Fourier Transform normalization provided in the parameters is not valid.
             
         # Returns:
             None
         """
-        if self.ft_normalization == "symmetric":
-            self.normalisation_factor = np.sqrt(self.area) / (2 * np.pi)
-        elif self.ft_normalization == "asymmetric_ft":
-            self.normalisation_factor = 1
-        elif self.ft_normalization == "asymmetric_ift":
-            self.normalisation_factor = self.area / (2 * np.pi) ** 2
+        self.normalisation_factor = ParametersHelper.compute_normalisation_factor(self.ft_normalization, self.area)
 
     def compute_inverse_fourier_transform(self) -> None:
         """
@@ -287,6 +302,49 @@ class MainProgram:
         self.computed_correlation_function = self.normalisation_factor * self.inverse_fourier_transform_method(
             self.frequency_spectrum)
 
+    def fit_correlation_function(self) -> None:
+        """
+        Fits the computed correlation function with piecewise Chebyshev polynomials in log(r) (see CorrelationFit.py)
+        and saves the fit in the current calculation directory.
+
+        # Remarks:
+            The correlation function is sampled at the same points as the ones saved in the CSV file.
+
+        # Raises:
+            ValueError: If the computed correlation function has too few usable samples to be fitted.
+
+        # Returns:
+            None
+        """
+        distance: np.ndarray = np.sqrt(self.space_array_x ** 2 + self.space_array_y ** 2)
+        self.correlation_fit = CorrelationFit.fit(distance,
+                                                  self.computed_correlation_function[:, :self.resolution],
+                                                  self.correlation_fit_segments, self.correlation_fit_degree)
+        self.correlation_fit.save(self.correlation_fit_path)
+
+    def compute_empirical_correlation_function(self, number_of_batches: int, batch_size: int,
+                                               seed: int = None) -> HeightFieldGenerator:
+        """
+        Measures the correlation function on random height fields drawn from the frequency spectrum, normalised in the
+        same way as the computed correlation function so that both can be compared.
+
+        # Args:
+            number_of_batches (int): The number of batches of height fields to draw.
+            batch_size (int): The number of height fields per batch.
+            seed (int): The seed of the random generator.
+
+        # Remarks:
+            The frequency spectrum must have been computed before calling this method.
+
+        # Returns:
+            HeightFieldGenerator: The generator used, holding the running statistics of the realizations.
+        """
+        generator: HeightFieldGenerator = HeightFieldGenerator(self.frequency_spectrum, batch_size, seed)
+        for _ in generator.generate(number_of_batches):
+            pass
+        self.empirical_correlation_function = self.normalisation_factor * generator.empirical_correlation_function()
+        return generator
+
     def save_results(self) -> None:
         """
         Saves the results to CSV files in the current calculation directory.
@@ -346,6 +404,11 @@ class MainProgram:
         self.compute_inverse_fourier_transform()
         print("Saving results...")
         self.save_results()
+        print("Fitting correlation function...")
+        try:
+            self.fit_correlation_function()
+        except ValueError as error:
+            print(f"The correlation function could not be fitted: {error}")
 
         print("Plotting results...")
         visualizer: Visualizer = Visualizer(self.calculation_paths_file_path)
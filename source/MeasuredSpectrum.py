@@ -0,0 +1,397 @@
+from pathlib import Path
+
+import numpy as np
+
+
+class MeasuredSpectrum:
+    """
+    Class that gives access to a tabulated (measured) frequency spectrum stored on disk and resamples it onto the wave
+    vectors of the calculation without loading the whole file in memory.
+
+    # Remarks:
+        The file is memory-mapped (`.npy` and raw binary files) or read by slices (HDF5 files, requires h5py), and only
+        the rows needed by the resampling are read, by blocks of `chunk_rows` rows.\n
+        A 2D table is indexed as `table[i_y, j_x]`, i.e. the rows correspond to the wave vectors in the y direction
+        and the columns to the wave vectors in the x direction. A 1D table is considered to be a radial spectrum
+        tabulated on the `wave_vector_x` axis and is evaluated at the norm of the wave vectors.\n
+        The wave vector axes of the table are described by their bounds and their spacing (`linear` or `log`). The
+        points outside of the tabulated range are given the `fill_value`.\n
+        An instance has the same call signature as the methods of Spectrums.py so that it can be used as the
+        `spectrum_function` of the MainProgram. The physical parameters are ignored since the spectrum is measured.\n
+        The radial profile of a radially averaged 2D table is computed once and kept on the instance. An instance can
+        be used as a context manager to close the underlying file.
+
+    # Attributes:
+        - `path (str)`: The path to the spectrum file.
+        - `table (numpy.ndarray | h5py.Dataset)`: The memory-mapped (or lazily read) tabulated spectrum.
+        - `wave_vector_axes (list)`: The descriptions of the wave vector axes of the table (y first for 2D tables).
+        - `radial_average (bool)`: Flag indicating if the spectrum is radially averaged before being resampled.
+        - `radial_bins (int)`: The number of logarithmic bins used for the radial average.
+        - `fill_value (float)`: The value given to the wave vectors outside of the tabulated range.
+        - `chunk_rows (int)`: The number of rows of the table read at once.
+        - `file (h5py.File)`: The opened HDF5 file (None for the memory-mapped formats).
+        - `radial_profile (tuple)`: The cached radial profile of a radially averaged 2D table.
+
+    # Methods:
+        - `from_parameters(parameters)`: Creates a MeasuredSpectrum from the "measured_spectrum" parameters.
+        - `open_table(path, file_format, dtype, shape, offset, dataset)`: Opens the tabulated spectrum lazily.
+        - `close()`: Closes the underlying file.
+        - `resample(wave_vector_x, wave_vector_y)`: Resamples the spectrum onto the given wave vectors.
+        - `axis_values(axis, size)`: Computes the wave vectors of a tabulated axis.
+        - `fractional_index(axis, size, wave_vector)`: Computes the fractional index of wave vectors along an axis.
+        - `interpolate_table(wave_vector_x, wave_vector_y)`: Interpolates bilinearly a 2D table.
+        - `interpolate_radial_table(wave_vector_norm)`: Interpolates linearly a 1D table.
+        - `compute_radial_profile()`: Computes the radially averaged spectrum by streaming over the table.
+        - `interpolate_radial_profile(radial_wave_vector, radial_spectrum, wave_vector_norm)`: Interpolates a radial
+        spectrum.
+    """
+
+    def __init__(self, path: str, wave_vector_x: dict, wave_vector_y: dict = None, file_format: str = None,
+                 dtype: str = "float64", shape: list = None, offset: int = 0, dataset: str = "spectrum",
+                 radial_average: bool = False, radial_bins: int = None, fill_value: float = 0.0,
+                 chunk_rows: int = 1024) -> None:
+        """
+        Initializes the MeasuredSpectrum object and opens the tabulated spectrum.
+
+        # Args:
+            path (str): The path to the spectrum file.
+            wave_vector_x (dict): The description of the x axis of the table: `{"min": ..., "max": ...,
+            "spacing": "linear" | "log"}`.
+            wave_vector_y (dict): The description of the y axis of the table (only for 2D tables).
+            file_format (str): The format of the file (`npy`, `raw` or `hdf5`), deduced from the extension if None.
+            dtype (str): The data type of a raw binary file.
+            shape (list): The shape of a raw binary file.
+            offset (int): The offset in bytes of the data in a raw binary file.
+            dataset (str): The name of the dataset in a HDF5 file.
+            radial_average (bool): Flag indicating if the spectrum is radially averaged before being resampled.
+            radial_bins (int): The number of logarithmic bins used for the radial average (defaults to the smallest
+            dimension of the table).
+            fill_value (float): The value given to the wave vectors outside of the tabulated range.
+            chunk_rows (int): The number of rows of the table read at once.
+
+        # Raises:
+            ValueError: If the table is neither 1D nor 2D or if the y axis is missing for a 2D table.
+
+        # Returns:
+            None
+        """
+        self.path: str = path
+        self.table, self.file = MeasuredSpectrum.open_table(path, file_format, dtype, shape, offset, dataset)
+        dimensions: int = len(self.table.shape)
+        if dimensions == 2 and wave_vector_y is not None:
+            self.wave_vector_axes: list = [wave_vector_y, wave_vector_x]
+        elif dimensions == 1:
+            self.wave_vector_axes: list = [wave_vector_x]
+        else:
+            self.close()
+            if dimensions == 2:
+                raise ValueError("The y wave vector axis must be provided for a 2D measured spectrum.")
+            raise ValueError("The measured spectrum must be a 1D or 2D table.")
+        self.radial_average: bool = radial_average
+        self.radial_bins: int = radial_bins if radial_bins is not None else min(self.table.shape)
+        self.fill_value: float = fill_value
+        self.chunk_rows: int = chunk_rows
+        self.radial_profile: tuple = None
+
+    @staticmethod
+    def from_parameters(parameters: dict) -> "MeasuredSpectrum":
+        """
+        Creates a MeasuredSpectrum from the "measured_spectrum" entry of the "Parameters.json" file.
+
+        # Args:
+            parameters (dict): The "measured_spectrum" parameters, whose keys are the arguments of the constructor.
+
+        # Returns:
+            MeasuredSpectrum: The measured spectrum.
+        """
+        return MeasuredSpectrum(**parameters)
+
+    @staticmethod
+    def open_table(path: str, file_format: str = None, dtype: str = "float64", shape: list = None, offset: int = 0,
+                   dataset: str = "spectrum"):
+        """
+        Opens the tabulated spectrum without reading it.
+
+        # Args:
+            path (str): The path to the spectrum file.
+            file_format (str): The format of the file (`npy`, `raw` or `hdf5`), deduced from the extension if None.
+            dtype (str): The data type of a raw binary file.
+            shape (list): The shape of a raw binary file.
+            offset (int): The offset in bytes of the data in a raw binary file.
+            dataset (str): The name of the dataset in a HDF5 file.
+
+        # Raises:
+            ValueError: If the format is not valid or if the shape of a raw binary file is missing.
+
+        # Returns:
+            tuple: The lazily read table (numpy.memmap or h5py.Dataset) and the opened HDF5 file (None for the
+            memory-mapped formats).
+        """
+        if file_format is None:
+            extension: str = Path(path).suffix.lower()
+            if extension == ".npy":
+                file_format = "npy"
+            elif extension in (".h5", ".hdf5"):
+                file_format = "hdf5"
+            else:
+                file_format = "raw"
+
+        if file_format == "npy":
+            return np.load(path, mmap_mode="r"), None
+        elif file_format == "raw":
+            if shape is None:
+                raise ValueError("The shape of a raw binary measured spectrum must be provided.")
+            return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=tuple(shape)), None
+        elif file_format == "hdf5":
+            import h5py
+            file = h5py.File(path, "r")
+            try:
+                return file[dataset], file
+            except KeyError:
+                file.close()
+                raise
+        else:
+            raise ValueError("The format of the measured spectrum is not valid.")
+
+    def close(self) -> None:
+        """
+        Closes the underlying file. The memory-mapped tables are released with the instance.
+
+        # Returns:
+            None
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> "MeasuredSpectrum":
+        """
+        Enters the context of the measured spectrum.
+
+        # Returns:
+            MeasuredSpectrum: The measured spectrum.
+        """
+        return self
+
+    def __exit__(self, *exception_information) -> None:
+        """
+        Closes the underlying file when leaving the context of the measured spectrum.
+
+        # Args:
+            exception_information: The type, value and traceback of the exception raised in the context, if any.
+
+        # Returns:
+            None
+        """
+        self.close()
+
+    def __call__(self, wave_vector_x: np.ndarray, wave_vector_y: np.ndarray, *physical_parameters) -> np.ndarray:
+        """
+        Resamples the spectrum onto the given wave vectors, with the call signature of the methods of Spectrums.py.
+
+        # Args:
+            wave_vector_x (numpy.ndarray): wave vector in the x direction.
+            wave_vector_y (numpy.ndarray): wave vector in the y direction.
+            physical_parameters: The physical parameters of the system, ignored for a measured spectrum.
+
+        # Returns:
+            numpy.ndarray: The spectrum
+        """
+        return self.resample(wave_vector_x, wave_vector_y)
+
+    def resample(self, wave_vector_x: np.ndarray, wave_vector_y: np.ndarray) -> np.ndarray:
+        """
+        Resamples the spectrum onto the given wave vectors.
+
+        # Remarks:
+            A 2D table is interpolated bilinearly in the index space of its axes (i.e. in log scale for a `log`
+            spacing), a 1D table linearly in the index space of its axis and the radial profile of a radially averaged
+            2D table linearly in log scale of the wave vector norm.
+
+        # Args:
+            wave_vector_x (numpy.ndarray): wave vector in the x direction.
+            wave_vector_y (numpy.ndarray): wave vector in the y direction.
+
+        # Returns:
+            numpy.ndarray: The resampled spectrum, with the shape of the wave vector arrays.
+        """
+        if self.radial_average or len(self.table.shape) == 1:
+            wave_vector_norm: np.ndarray = np.sqrt(wave_vector_x ** 2 + wave_vector_y ** 2)
+            if len(self.table.shape) == 1:
+                return self.interpolate_radial_table(wave_vector_norm)
+            if self.radial_profile is None:
+                self.radial_profile = self.compute_radial_profile()
+            return self.interpolate_radial_profile(*self.radial_profile, wave_vector_norm)
+        return self.interpolate_table(wave_vector_x, wave_vector_y)
+
+    @staticmethod
+    def axis_values(axis: dict, size: int) -> np.ndarray:
+        """
+        Computes the wave vectors of a tabulated axis.
+
+        # Args:
+            axis (dict): The description of the axis.
+            size (int): The number of points of the axis.
+
+        # Returns:
+            numpy.ndarray: The wave vectors of the axis.
+        """
+        if axis.get("spacing", "linear") == "log":
+            return np.logspace(np.log10(axis["min"]), np.log10(axis["max"]), size)
+        return np.linspace(axis["min"], axis["max"], size)
+
+    @staticmethod
+    def fractional_index(axis: dict, size: int, wave_vector: np.ndarray) -> np.ndarray:
+        """
+        Computes the fractional index of the given wave vectors along a tabulated axis.
+
+        # Args:
+            axis (dict): The description of the axis.
+            size (int): The number of points of the axis.
+            wave_vector (numpy.ndarray): The wave vectors.
+
+        # Returns:
+            numpy.ndarray: The fractional indices (NaN for non positive wave vectors on a `log` axis).
+        """
+        if axis.get("spacing", "linear") == "log":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                position: np.ndarray = np.log(wave_vector / axis["min"]) / np.log(axis["max"] / axis["min"])
+        else:
+            position: np.ndarray = (wave_vector - axis["min"]) / (axis["max"] - axis["min"])
+        return position * (size - 1)
+
+    def interpolate_table(self, wave_vector_x: np.ndarray, wave_vector_y: np.ndarray) -> np.ndarray:
+        """
+        Interpolates bilinearly a 2D table at the given wave vectors by reading only the rows needed.
+
+        # Args:
+            wave_vector_x (numpy.ndarray): wave vector in the x direction.
+            wave_vector_y (numpy.ndarray): wave vector in the y direction.
+
+        # Returns:
+            numpy.ndarray: The interpolated spectrum.
+        """
+        rows_number, columns_number = self.table.shape
+        row_index: np.ndarray = self.fractional_index(self.wave_vector_axes[0], rows_number, wave_vector_y.ravel())
+        column_index: np.ndarray = self.fractional_index(self.wave_vector_axes[1], columns_number,
+                                                         wave_vector_x.ravel())
+        spectrum: np.ndarray = np.full(row_index.shape, self.fill_value, dtype=float)
+
+        inside: np.ndarray = ((row_index >= 0) & (row_index <= rows_number - 1)
+                              & (column_index >= 0) & (column_index <= columns_number - 1))
+        points: np.ndarray = np.flatnonzero(inside)
+        if points.size == 0:
+            return spectrum.reshape(wave_vector_x.shape)
+        spectrum[points] = 0.0
+
+        lower_row: np.ndarray = np.minimum(np.floor(row_index[points]).astype(int), rows_number - 2)
+        lower_column: np.ndarray = np.minimum(np.floor(column_index[points]).astype(int), columns_number - 2)
+        row_weight: np.ndarray = row_index[points] - lower_row
+        column_weight: np.ndarray = column_index[points] - lower_column
+
+        contribution_points: np.ndarray = np.tile(points, 4)
+        contribution_rows: np.ndarray = np.concatenate([lower_row, lower_row, lower_row + 1, lower_row + 1])
+        contribution_columns: np.ndarray = np.concatenate([lower_column, lower_column + 1,
+                                                           lower_column, lower_column + 1])
+        contribution_weights: np.ndarray = np.concatenate([(1 - row_weight) * (1 - column_weight),
+                                                           (1 - row_weight) * column_weight,
+                                                           row_weight * (1 - column_weight),
+                                                           row_weight * column_weight])
+
+        needed_rows: np.ndarray = np.unique(contribution_rows)
+        for start in range(0, needed_rows.size, self.chunk_rows):
+            chunk: np.ndarray = needed_rows[start:start + self.chunk_rows]
+            block: np.ndarray = np.asarray(self.table[chunk], dtype=float)
+            selected: np.ndarray = np.flatnonzero((contribution_rows >= chunk[0]) & (contribution_rows <= chunk[-1]))
+            local_rows: np.ndarray = np.searchsorted(chunk, contribution_rows[selected])
+            np.add.at(spectrum, contribution_points[selected],
+                      contribution_weights[selected] * block[local_rows, contribution_columns[selected]])
+
+        return spectrum.reshape(wave_vector_x.shape)
+
+    def interpolate_radial_table(self, wave_vector_norm: np.ndarray) -> np.ndarray:
+        """
+        Interpolates linearly a 1D table at the given wave vector norms by reading only the bracketing entries.
+
+        # Args:
+            wave_vector_norm (numpy.ndarray): The wave vector norms.
+
+        # Returns:
+            numpy.ndarray: The interpolated spectrum.
+        """
+        size: int = self.table.shape[0]
+        index: np.ndarray = self.fractional_index(self.wave_vector_axes[0], size, wave_vector_norm.ravel())
+        spectrum: np.ndarray = np.full(index.shape, self.fill_value, dtype=float)
+
+        points: np.ndarray = np.flatnonzero((index >= 0) & (index <= size - 1))
+        if points.size == 0:
+            return spectrum.reshape(wave_vector_norm.shape)
+        lower: np.ndarray = np.clip(np.floor(index[points]).astype(int), 0, max(size - 2, 0))
+        upper: np.ndarray = np.minimum(lower + 1, size - 1)
+        weight: np.ndarray = index[points] - lower
+
+        needed: np.ndarray = np.unique(np.concatenate([lower, upper]))
+        values: np.ndarray = np.empty(needed.size)
+        for start in range(0, needed.size, self.chunk_rows):
+            values[start:start + self.chunk_rows] = self.table[needed[start:start + self.chunk_rows]]
+        spectrum[points] = ((1 - weight) * values[np.searchsorted(needed, lower)]
+                            + weight * values[np.searchsorted(needed, upper)])
+        return spectrum.reshape(wave_vector_norm.shape)
+
+    def compute_radial_profile(self) -> tuple:
+        """
+        Computes the radially averaged spectrum of a 2D table by streaming over its rows.
+
+        # Remarks:
+            The norms of the tabulated wave vectors are binned in `radial_bins` logarithmic bins between the smallest
+            positive and the largest norm. The empty bins are discarded.
+
+        # Returns:
+            tuple: The mean wave vector norm and the mean spectrum of each non empty bin.
+        """
+        rows_number, columns_number = self.table.shape
+        wave_vector_y: np.ndarray = self.axis_values(self.wave_vector_axes[0], rows_number)
+        wave_vector_x: np.ndarray = self.axis_values(self.wave_vector_axes[1], columns_number)
+
+        absolute_x: np.ndarray = np.abs(wave_vector_x)
+        absolute_y: np.ndarray = np.abs(wave_vector_y)
+        min_norm: float = np.hypot(absolute_x.min(), absolute_y.min())
+        if min_norm == 0:
+            min_norm = min(absolute_x[absolute_x > 0].min(initial=np.inf),
+                           absolute_y[absolute_y > 0].min(initial=np.inf))
+        max_norm: float = np.hypot(absolute_x.max(), absolute_y.max())
+        bin_edges: np.ndarray = np.logspace(np.log10(min_norm), np.log10(max_norm), self.radial_bins + 1)
+
+        spectrum_sum: np.ndarray = np.zeros(self.radial_bins)
+        norm_sum: np.ndarray = np.zeros(self.radial_bins)
+        counts: np.ndarray = np.zeros(self.radial_bins)
+        for start in range(0, rows_number, self.chunk_rows):
+            stop: int = min(start + self.chunk_rows, rows_number)
+            block: np.ndarray = np.asarray(self.table[start:stop], dtype=float)
+            norm: np.ndarray = np.hypot(wave_vector_x[np.newaxis, :], wave_vector_y[start:stop, np.newaxis])
+            bins: np.ndarray = np.clip(np.searchsorted(bin_edges, norm, side="right") - 1, 0, self.radial_bins - 1)
+            valid: np.ndarray = (norm >= min_norm) & np.isfinite(block)
+            spectrum_sum += np.bincount(bins[valid], weights=block[valid], minlength=self.radial_bins)
+            norm_sum += np.bincount(bins[valid], weights=norm[valid], minlength=self.radial_bins)
+            counts += np.bincount(bins[valid], minlength=self.radial_bins)
+
+        filled: np.ndarray = counts > 0
+        return norm_sum[filled] / counts[filled], spectrum_sum[filled] / counts[filled]
+
+    def interpolate_radial_profile(self, radial_wave_vector: np.ndarray, radial_spectrum: np.ndarray,
+                                   wave_vector_norm: np.ndarray) -> np.ndarray:
+        """
+        Interpolates a radial spectrum at the given wave vector norms, linearly in log scale of the norm.
+
+        # Args:
+            radial_wave_vector (numpy.ndarray): The increasing wave vector norms of the radial spectrum.
+            radial_spectrum (numpy.ndarray): The radial spectrum.
+            wave_vector_norm (numpy.ndarray): The wave vector norms at which the spectrum is interpolated.
+
+        # Returns:
+            numpy.ndarray: The interpolated spectrum.
+        """
+        positive: np.ndarray = radial_wave_vector > 0
+        with np.errstate(divide="ignore"):
+            return np.interp(np.log(wave_vector_norm), np.log(radial_wave_vector[positive]),
+                             radial_spectrum[positive], left=self.fill_value, right=self.fill_value)
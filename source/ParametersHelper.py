@@ -0,0 +1,149 @@
+import json
+
+import numpy as np
+
+from FourierTransform import FourierTransform
+from MeasuredSpectrum import MeasuredSpectrum
+from Spectrums import FrequencySpectrums
+
+
+class ParametersHelper:
+    """
+    Helper class for the quantities derived from the parameters, shared by the MainProgram and the CorrelationService.
+
+    # Attributes:
+        `calculation_parameters (tuple)`: The names of the parameters on which the computed correlation function
+        depends (plus `measured_spectrum` for a measured spectrum).
+    """
+
+    calculation_parameters: tuple = ("temperature", "volumic_mass", "surface_tension", "kappa", "area",
+                                     "spectrum_function", "inverse_fourier_transform_method", "resolution",
+                                     "ft_normalization")
+
+    @staticmethod
+    def compute_characteristic_frequencies(volumic_mass: float, surface_tension: float, kappa: float) -> dict:
+        """
+        Computes the characteristic frequencies of the membrane and the bounds of the frequency and distance arrays.
+
+        # Args:
+            volumic_mass (float): The volumic mass.
+            surface_tension (float): The surface tension.
+            kappa (float): The bending rigidity modulus.
+
+        # Returns:
+            dict: The `capillary_frequency`, `curvature_frequency`, `min_frequency`, `max_frequency`, `min_distance`
+            and `max_distance`.
+        """
+        capillary_frequency: float = np.sqrt(volumic_mass / surface_tension)
+        curvature_frequency: float = np.sqrt(surface_tension / kappa)
+        min_frequency: float = curvature_frequency * 1e-13
+        max_frequency: float = curvature_frequency * 10
+        return {"capillary_frequency": capillary_frequency, "curvature_frequency": curvature_frequency,
+                "min_frequency": min_frequency, "max_frequency": max_frequency, "min_distance": 1 / max_frequency,
+                "max_distance": 1 / min_frequency}
+
+    @staticmethod
+    def compute_wave_vector_grid(min_frequency: float, max_frequency: float, resolution: int) -> tuple:
+        """
+        Computes the logarithmic wave vector grid of the calculation.
+
+        # Args:
+            min_frequency (float): The lower bound of the frequency.
+            max_frequency (float): The upper bound of the frequency.
+            resolution (int): The number of points in each direction.
+
+        # Returns:
+            tuple: The wave vectors in the x and y directions.
+        """
+        wave_vector_array: np.ndarray = np.logspace(np.log10(min_frequency), np.log10(max_frequency), resolution)
+        return tuple(np.meshgrid(wave_vector_array, wave_vector_array))
+
+    @staticmethod
+    def compute_normalisation_factor(ft_normalization: str, area: float) -> float:
+        """
+        Computes the normalisation factor of the inverse Fourier Transform (see
+        MainProgram.assign_normalisation_factor).
+
+        # Args:
+            ft_normalization (str): The normalization method for Fourier Transform.
+            area (float): The area of the cell.
+
+        # Raises:
+            ValueError: If the normalization method is not valid.
+
+        # Returns:
+            float: The normalisation factor.
+        """
+        if ft_normalization == "symmetric":
+            return np.sqrt(area) / (2 * np.pi)
+        elif ft_normalization == "asymmetric_ft":
+            return 1
+        elif ft_normalization == "asymmetric_ift":
+            return area / (2 * np.pi) ** 2
+        raise ValueError("The Fourier Transform normalization provided in the parameters is not valid.")
+
+    @staticmethod
+    def resolve_spectrum_function(parameters: dict, measured_spectrum: MeasuredSpectrum = None) -> callable:
+        """
+        Returns the spectrum function named by the `spectrum_function` parameter, i.e. a method of Spectrums.py or,
+        for the special name `measured_spectrum`, the tabulated spectrum described by the "measured_spectrum"
+        parameters.
+
+        # Args:
+            parameters (dict): The parameters.
+            measured_spectrum (MeasuredSpectrum): An already opened measured spectrum to use instead of opening the
+            one described by the parameters.
+
+        # Raises:
+            ValueError: If the spectrum function provided in the parameters is not valid.
+
+        # Returns:
+            callable: The spectrum function.
+        """
+        if parameters["spectrum_function"] == "measured_spectrum":
+            if measured_spectrum is not None:
+                return measured_spectrum
+            return MeasuredSpectrum.from_parameters(parameters["measured_spectrum"])
+        spectrum_method: callable = getattr(FrequencySpectrums, parameters["spectrum_function"], None)
+        if spectrum_method is None or not callable(spectrum_method):
+            raise ValueError("The spectrum function provided in the parameters is not valid.")
+        return spectrum_method
+
+    @staticmethod
+    def resolve_inverse_fourier_transform_method(inverse_fourier_transform_method: str) -> callable:
+        """
+        Returns the method of FourierTransform.py with the given name.
+
+        # Args:
+            inverse_fourier_transform_method (str): The name of the inverse fourier transform method.
+
+        # Raises:
+            ValueError: If the inverse fourier transform method provided in the parameters is not valid.
+
+        # Returns:
+            callable: The inverse fourier transform method.
+        """
+        method: callable = getattr(FourierTransform, inverse_fourier_transform_method, None)
+        if method is None or not callable(method):
+            raise ValueError("The inverse fourier transform method provided in the parameters is not valid.")
+        return method
+
+    @staticmethod
+    def calculation_key(parameters: dict) -> str:
+        """
+        Returns a canonical key of the parameters on which the computed correlation function depends, so that
+        parameters differing only by unused entries (e.g. `is_accuracy_test`) give the same key.
+
+        # Args:
+            parameters (dict): The parameters.
+
+        # Raises:
+            KeyError: If a parameter of the calculation is missing.
+
+        # Returns:
+            str: The canonical key.
+        """
+        used_parameters: dict = {name: parameters[name] for name in ParametersHelper.calculation_parameters}
+        if parameters["spectrum_function"] == "measured_spectrum":
+            used_parameters["measured_spectrum"] = parameters["measured_spectrum"]
+        return json.dumps(used_parameters, sort_keys=True)
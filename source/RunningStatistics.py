@@ -0,0 +1,89 @@
+import numpy as np
+
+
+class RunningStatistics:
+    """
+    Class that accumulates the element-wise mean and variance of a stream of arrays in constant memory.
+
+    # Remarks:
+        The accumulation uses the Welford algorithm, extended to whole batches with the pairwise update of Chan et al.
+        so that a batch of realizations can be merged in a single vectorized step.
+
+    # Attributes:
+        - `count (int)`: The number of samples accumulated so far.
+        - `mean (numpy.ndarray)`: The running element-wise mean.
+        - `sum_of_squared_deviations (numpy.ndarray)`: The running element-wise sum of squared deviations from the mean.
+
+    # Methods:
+        - `update(batch)`: Merges a batch of samples into the running estimates.
+        - `variance()`: Returns the unbiased element-wise variance.
+        - `standard_error()`: Returns the element-wise standard error of the mean.
+    """
+
+    def __init__(self, shape: tuple) -> None:
+        """
+        Initializes the RunningStatistics object with empty estimates.
+
+        # Args:
+            shape (tuple): The shape of a single sample.
+
+        # Returns:
+            None
+        """
+        self.count: int = 0
+        self.mean: np.ndarray = np.zeros(shape)
+        self.sum_of_squared_deviations: np.ndarray = np.zeros(shape)
+        self._scratch: np.ndarray = None
+
+    def update(self, batch: np.ndarray) -> None:
+        """
+        Merges a batch of samples into the running estimates.
+
+        # Args:
+            batch (numpy.ndarray): The samples stacked along the first axis.
+
+        # Raises:
+            ValueError: If the shape of the samples does not match the accumulated shape.
+
+        # Returns:
+            None
+        """
+        if batch.shape[1:] != self.mean.shape:
+            raise ValueError("The shape of the samples does not match the shape of the running statistics.")
+
+        batch_count: int = batch.shape[0]
+        if batch_count == 0:
+            return
+        batch_mean: np.ndarray = batch.mean(axis=0)
+        if self._scratch is None or self._scratch.shape != batch.shape:
+            self._scratch = np.empty(batch.shape)
+        np.subtract(batch, batch_mean, out=self._scratch)
+        np.square(self._scratch, out=self._scratch)
+        batch_sum_of_squared_deviations: np.ndarray = self._scratch.sum(axis=0)
+
+        total_count: int = self.count + batch_count
+        delta: np.ndarray = batch_mean - self.mean
+        self.mean += delta * (batch_count / total_count)
+        self.sum_of_squared_deviations += (batch_sum_of_squared_deviations
+                                           + delta ** 2 * (self.count * batch_count / total_count))
+        self.count = total_count
+
+    def variance(self) -> np.ndarray:
+        """
+        Returns the unbiased element-wise variance of the accumulated samples.
+
+        # Returns:
+            numpy.ndarray: The variance (NaN while fewer than two samples have been accumulated).
+        """
+        if self.count < 2:
+            return np.full(self.mean.shape, np.nan)
+        return self.sum_of_squared_deviations / (self.count - 1)
+
+    def standard_error(self) -> np.ndarray:
+        """
+        Returns the element-wise standard error of the mean of the accumulated samples.
+
+        # Returns:
+            numpy.ndarray: The standard error of the mean.
+        """
+        return np.sqrt(self.variance() / max(self.count, 1))